@@ -2,10 +2,23 @@ from sqlalchemy import create_engine, Column, String, DateTime, Text, Boolean, J
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, relationship
 from datetime import datetime
+import time
+from typing import List, Optional
 from config import settings
 
+def _engine_options(database_url: str) -> dict:
+    """Pool settings for server databases; SQLite is a local file and keeps SQLAlchemy's defaults"""
+    if database_url.startswith("sqlite"):
+        return {}
+    return {
+        "pool_size": 20,
+        "max_overflow": 20,
+        "pool_pre_ping": True,  # drop connections the server closed instead of failing the request
+        "pool_recycle": 1800,
+    }
+
 # Create database engine
-engine = create_engine(settings.database_url)
+engine = create_engine(settings.database_url, **_engine_options(settings.database_url))
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
@@ -28,6 +41,25 @@ class ApiKey(Base):
             "created_at": self.created_at
         }
 
+# API keys change rarely, so the serialized rows are kept in memory between reads. create paths
+# call invalidate_api_key_cache(); the TTL bounds staleness from writes made outside this process.
+API_KEY_CACHE_TTL = 60
+_api_key_cache: Optional[List[dict]] = None
+_api_key_cache_expires = 0.0
+
+def get_api_key_dicts(db) -> List[dict]:
+    """Return every ApiKey row as a dict, from the in-process cache when it is fresh"""
+    global _api_key_cache, _api_key_cache_expires
+    now = time.monotonic()
+    if _api_key_cache is None or now >= _api_key_cache_expires:
+        _api_key_cache = [key.to_dict() for key in db.query(ApiKey).all()]
+        _api_key_cache_expires = now + API_KEY_CACHE_TTL
+    return _api_key_cache
+
+def invalidate_api_key_cache():
+    global _api_key_cache
+    _api_key_cache = None
+
 # Add these models
 class User(Base):
     __tablename__ = "users"
@@ -5,6 +5,7 @@ from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from pydantic import BaseModel, Field
 from typing import List, Optional, Dict, Any
 import uuid
+import asyncio
 import os
 import logging
 from datetime import datetime, timedelta
@@ -12,20 +13,19 @@ from config import settings
 import json
 from pathlib import Path as PathLib
 from fastapi.responses import FileResponse
-import time
 
 # Suppress the bcrypt warning
 import warnings
 warnings.filterwarnings("ignore", message=".*error reading bcrypt version.*")
 
 from sqlalchemy.orm import Session
-from database import AgentDB, TestCaseDB, TestRunDB, get_db, ApiKey, User as DBUser, MetricDB, EvaluationDB
+from database import AgentDB, TestCaseDB, TestRunDB, get_db, ApiKey, User as DBUser, MetricDB, EvaluationDB, get_api_key_dicts, invalidate_api_key_cache
 from passlib.context import CryptContext
 from jose import JWTError, jwt
 
 # Import VoxHog components
 from voxhog import VoiceTestRunner, TestCase, UserPersona, Scenario, VoiceAgent
-from voxhog.voice_agent import Direction
+from voxhog.voice_agent import Direction, warmup_shared
 from voxhog.voice_agent_evaluation import VoiceAgentEvaluator, VoiceAgentMetric
 from transcriber import Transcriber
 
@@ -619,7 +619,8 @@ async def run_test(run_id: str, agent_id_from_run: str, test_case_ids: List[str]
                     voice_agent_api_args=db_test_run.outbound_call_params if agent_base_config_dict["direction"] == "OUTBOUND" else None,
                     language=tc_language, # From TestCase's UserPersona
                     accent=tc_accent,     # From TestCase's UserPersona
-                    audio_file_name=audio_file_name_for_tc
+                    audio_file_name=audio_file_name_for_tc,
+                    record_audio=True
                 )
                 logger.info(f"VoiceAgent initialized for test_id: {test_id} in run_id: {run_id}")
                 
@@ -665,7 +666,8 @@ async def run_test(run_id: str, agent_id_from_run: str, test_case_ids: List[str]
                     evaluator=evaluator
                 )
                 
-                single_test_runner = VoiceTestRunner(agent=current_agent_for_tc)
+                # Runner setup (ngrok tunnel, server thread start-up) blocks, so keep it off the API server's loop
+                single_test_runner = await asyncio.to_thread(VoiceTestRunner, agent=current_agent_for_tc)
                 single_test_runner.add_test_case(test_case_obj)
                 
                 logger.info(f"Running test case {test_id} for test run {run_id} with lang=\'{tc_language}\' accent=\'{tc_accent}\'")
@@ -715,9 +717,9 @@ async def run_test(run_id: str, agent_id_from_run: str, test_case_ids: List[str]
             if single_test_runner:
                 logger.info(f"Cleaning up VoiceTestRunner for test_id: {test_id} in run_id: {run_id}")
                 try:
-                    single_test_runner.cleanup()
+                    await asyncio.to_thread(single_test_runner.cleanup)
                     logger.info(f"VoiceTestRunner cleanup successful for test_id: {test_id} in run_id: {run_id}")
-                    time.sleep(10) # Sleep for 10 seconds after cleanup
+                    await asyncio.sleep(10) # Sleep for 10 seconds after cleanup
                 except Exception as cleanup_error:
                     logger.error(f"Error during VoiceTestRunner cleanup for test_id: {test_id}: {cleanup_error}", exc_info=True)
 
@@ -1135,6 +1137,7 @@ async def create_api_key(
     db.add(db_key)
     db.commit()
     db.refresh(db_key)
+    invalidate_api_key_cache()
     
     # Update environment variables in memory
     if api_key.service.upper() == "OPENAI":
@@ -1164,8 +1167,7 @@ async def list_api_keys(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    keys = db.query(ApiKey).all()
-    return [key.to_dict() for key in keys]
+    return get_api_key_dicts(db)
 
 @app.get("/api/v1/keys/{key_id}", response_model=ApiKeyFullResponse)
 async def get_api_key(
@@ -1324,6 +1326,9 @@ async def startup_event():
     # Load agents, test cases, and metrics from database
     await load_data_from_db()
 
+    # Load the shared VAD model now rather than on the first test call
+    await asyncio.to_thread(warmup_shared)
+
 # Function to load data from database into in-memory dictionaries
 async def load_data_from_db():
     logger.info("Loading data from database into memory...")
@@ -1648,4 +1653,4 @@ async def download_evaluation_recording(
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000) 
\ No newline at end of file
+    uvicorn.run(app, host="0.0.0.0", port=8000, loop="uvloop") 
\ No newline at end of file
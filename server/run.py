@@ -6,5 +6,6 @@ if __name__ == "__main__":
         "main:app",
         host="0.0.0.0",
         port=8000,
+        loop="uvloop",
         reload=settings.debug
     ) 
\ No newline at end of file
@@ -57,17 +57,11 @@ class Transcriber:
                 language="hi" # Consider making language configurable
             )
             
-            # If audio_data is a path (string), read it. Otherwise, assume it's bytes or BytesIO.
-            if isinstance(audio_data, str): # Assuming audio_data can be a path for this method
-                 with open(audio_data, 'rb') as f:
-                    payload = f.read()
+            if isinstance(audio_data, str):
+                # A path: read the file once straight into the payload
+                with open(audio_data, 'rb') as f:
+                    source = {'buffer': f.read(), 'mimetype': 'application/octet-stream'}
             elif isinstance(audio_data, io.BytesIO):
-                payload = {'buffer': audio_data, 'mimetype': 'application/octet-stream'} # Deepgram SDK expects buffer and mimetype
-            else: # Assuming audio_data is already bytes
-                payload = {'buffer': io.BytesIO(audio_data), 'mimetype': 'application/octet-stream'}
-
-            source = {'buffer': payload, 'mimetype': 'application/octet-stream'}
-            if isinstance(audio_data, io.BytesIO):
                 source = {'buffer': audio_data, 'mimetype': 'application/octet-stream'}
             elif isinstance(audio_data, bytes):
                 source = {'buffer': io.BytesIO(audio_data), 'mimetype': 'application/octet-stream'}
@@ -76,10 +70,7 @@ class Transcriber:
                 return None
 
             logger.info("Sending audio to Deepgram for transcription...")
-            # The Deepgram Python SDK's transcribe_file method actually takes a file path
-            # or a dictionary payload {'buffer': data, 'mimetype': 'audio/wav'}
-            # Let's ensure we're using it correctly. For prerecorded from buffer:
-            response = deepgram.listen.prerecorded.v("1").transcribe_file_path(audio_data, options) if isinstance(audio_data, str) else deepgram.listen.prerecorded.v("1").transcribe_file(source, options)
+            response = deepgram.listen.prerecorded.v("1").transcribe_file(source, options)
 
             logger.info("Transcription response received from Deepgram.")
             return response
@@ -151,18 +142,8 @@ class Transcriber:
             raise FileNotFoundError(f"Audio file not found at {audio_file_path}")
 
         try:
-            # Read audio data as bytes
-            with open(audio_file_path, 'rb') as audio_file:
-                audio_bytes = audio_file.read()
-            
-            # Use io.BytesIO for Deepgram SDK if it expects a file-like object for buffer
-            audio_buffer = io.BytesIO(audio_bytes)
-            
-            # Call transcribe_audio with the audio buffer
-            # The transcribe_audio method in the prompt expects a file path or bytes for `audio_data`
-            # Passing audio_file_path directly to transcribe_audio is an option if it handles reading
-            # For consistency, we'll pass the path and let transcribe_audio handle opening or use the buffer.
-            # Let's stick to passing the path, as transcribe_audio already has logic for it.
+            # Pass the path and let transcribe_audio hand it to the SDK; reading the
+            # file here would only make an unused in-memory copy of the recording.
             raw_transcription_result = self.transcribe_audio(audio_data=audio_file_path) # Pass path
 
             if raw_transcription_result is None:
@@ -27,6 +27,7 @@ async def main():
         },
         direction=Direction.INBOUND,
         audio_file_name="test_audio",
+        record_audio=True,
 
         voice_agent_api_args = {
                 'assistantId': os.getenv("TESTING_ASSISTANT_ID"),
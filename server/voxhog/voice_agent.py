@@ -4,16 +4,21 @@ from starlette.responses import HTMLResponse
 from twilio.twiml.voice_response import VoiceResponse, Connect
 from fastapi.responses import PlainTextResponse
 import json
+import audioop
+import binascii
+import orjson
 from twilio.rest import Client
 import logging
 from enum import Enum
 import os
-from pipecat.audio.vad.silero import SileroVADAnalyzer
+from pipecat.audio.vad.silero import SileroOnnxModel, SileroVADAnalyzer
 from pipecat.pipeline.pipeline import Pipeline
 from pipecat.pipeline.runner import PipelineRunner
 from pipecat.pipeline.task import PipelineParams, PipelineTask
 from pipecat.processors.aggregators.openai_llm_context import OpenAILLMContext
 from pipecat.processors.audio.audio_buffer_processor import AudioBufferProcessor
+from pipecat.audio.utils import pcm_to_ulaw, ulaw_to_pcm
+from pipecat.frames.frames import AudioRawFrame, InputAudioRawFrame
 from pipecat.serializers.twilio import TwilioFrameSerializer
 from pipecat.services.cartesia import CartesiaTTSService
 from pipecat.services.elevenlabs import ElevenLabsTTSService
@@ -21,13 +26,15 @@ from pipecat.services.deepgram import DeepgramSTTService
 from pipecat.services.openai import OpenAILLMService
 from pipecat.transports.network.fastapi_websocket import FastAPIWebsocketParams, FastAPIWebsocketTransport
 from pipecat.processors.transcript_processor import TranscriptProcessor
+from pipecat.utils.text.base_text_filter import BaseTextFilter
 from openai.types.chat import ChatCompletionToolParam
 from dataclasses import dataclass
+from functools import cached_property
 from typing import Literal, Optional, Dict
-from openai.types.chat import ChatCompletionToolParam
+import copy
 import datetime
-import io
-import wave
+import hashlib
+import struct
 import aiofiles
 
 # Import config values
@@ -37,11 +44,80 @@ from config import SUPPORTED_LANGUAGES_ACCENTS, ELEVENLABS_VOICE_MAPPING, DEFAUL
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# (language, accent) -> voice_id for every supported pair, resolved once at import.
+# Unsupported or missing language/accent falls through to the provider default.
+_ELEVENLABS_VOICES: Dict[tuple, str] = {
+    (language, accent): ELEVENLABS_VOICE_MAPPING.get((language, accent), DEFAULT_ELEVENLABS_VOICE_ID)
+    for language, accents in SUPPORTED_LANGUAGES_ACCENTS.items() for accent in accents
+}
+_CARTESIA_VOICES: Dict[tuple, str] = {
+    (language, accent): CARTESIA_VOICE_MAPPING.get((language, accent), DEFAULT_CARTESIA_VOICE_ID)
+    for language, accents in SUPPORTED_LANGUAGES_ACCENTS.items() for accent in accents
+}
+
+# Process-wide Silero VAD, loaded lazily on first use (see _get_vad_analyzer)
+_SILERO_VAD: Optional[SileroVADAnalyzer] = None
+
+def _get_vad_analyzer() -> SileroVADAnalyzer:
+    """
+    Return a VAD analyzer backed by the shared Silero ONNX model.
+
+    The model is loaded and warmed up once per process. Each caller gets its own
+    shallow copy with fresh model state, so concurrent streams share the ONNX
+    session but not their VAD buffers. Pipecat already runs analysis off the
+    event loop in the transport's executor, and ONNX Runtime sessions are safe
+    to run from several threads at once.
+    """
+    global _SILERO_VAD
+    if _SILERO_VAD is None:
+        logger.info("Loading shared Silero VAD model")
+        _SILERO_VAD = SileroVADAnalyzer()
+        # Optionally swap in a quantized (e.g. int8) Silero build for cheaper per-frame inference
+        vad_model_path = os.getenv("SILERO_VAD_MODEL_PATH")
+        if vad_model_path:
+            logger.info(f"Using Silero VAD model from {vad_model_path}")
+            _SILERO_VAD._model = SileroOnnxModel(vad_model_path, force_onnx_cpu=True)
+        # Warm up with 1s of 16 kHz silence (512-sample windows) so the first call doesn't pay for it
+        _SILERO_VAD.set_sample_rate(16000)
+        for _ in range(16000 // 512):
+            _SILERO_VAD.voice_confidence(bytes(1024))
+    analyzer = copy.copy(_SILERO_VAD)
+    analyzer._model = copy.copy(_SILERO_VAD._model)
+    analyzer._model.reset_states()
+    return analyzer
+
+# Tool schema the LLM uses to hang up; static, so built once at import
+_CALL_END_TOOL = ChatCompletionToolParam(
+    type="function",
+    function={
+        "name": "call_end",
+        "description": "End the current conversation",
+        "parameters": {
+            "type": "object",
+            "properties": {},
+            "required": []
+        }
+    }
+)
+
+_END_CALL_TWIML = "<Response><Hangup/></Response>"
+
+_SYSTEM_PROMPT_TEMPLATE = """You are an AI agent with the following persona:
+        {persona}
+
+        Current scenario:
+        {scenario}
+
+        Your responses will be converted to audio, so avoid using special characters."""
+
 class Direction(Enum):
     """Enum for call direction"""
     INBOUND = "inbound"
     OUTBOUND = "outbound"
 
+# Transcript roles are recorded from the testing agent's side; the rendered transcript swaps them
+_SWAPPED_ROLES = {"user": "assistant", "assistant": "user"}
+
 @dataclass
 class TranscriptionMessage:
     role: Literal["user", "assistant"]
@@ -50,31 +126,211 @@ class TranscriptionMessage:
 
 class TranscriptHandler:
     def __init__(self):
-        self.messages = []
+        # Transcript lines rendered once as messages arrive, so get_messages() is a single join
+        self._rendered_parts: list[str] = []
 
     async def on_transcript_update(self, processor, frame):
-        self.messages.extend(frame.messages)
         for msg in frame.messages:
+            self._rendered_parts.append(f"{_SWAPPED_ROLES[msg.role]}: {msg.content}")
             timestamp = f"[{msg.timestamp}] " if msg.timestamp else ""
             logger.info(f"{timestamp}{msg.role}: {msg.content}")
     
     def get_messages(self):
-        for message in self.messages:
-            if message.role == "assistant":
-                message.role = "user"
-            else:
-                
-                message.role = "assistant"
-            
-        messages= "\n".join([f"{msg.role}: {msg.content}" for msg in self.messages])
+        return "\n".join(self._rendered_parts)
+
+# Characters the system prompt asks the LLM to avoid; anything that slips through is dropped before TTS
+_TTS_STRIP_TABLE = str.maketrans("", "", "*_`~<>#")
+
+class SpecialCharTextFilter(BaseTextFilter):
+    """Stateless TTS text filter that strips markdown-ish special characters with one str.translate"""
+
+    def update_settings(self, settings):
+        pass
+
+    def filter(self, text: str) -> str:
+        return text.translate(_TTS_STRIP_TABLE)
+
+    def handle_interruption(self):
+        pass
+
+    def reset_interruption(self):
+        pass
+
+# Shared by every TTS service since the filter keeps no state
+_TTS_TEXT_FILTER = SpecialCharTextFilter()
+
+def _mulaw_wav_header(data_len: int, sample_rate: int, num_channels: int) -> bytes:
+    """
+    Build the 58-byte RIFF/WAVE header for `data_len` bytes of 8-bit mu-law
+    (WAVE_FORMAT_MULAW; non-PCM formats carry an 18-byte fmt chunk and a fact chunk).
+    """
+    return struct.pack(
+        "<4sI4s4sIHHIIHHH4sII4sI",
+        b"RIFF", 50 + data_len, b"WAVE",
+        b"fmt ", 18, 7, num_channels, sample_rate, sample_rate * num_channels, num_channels, 8, 0,
+        b"fact", 4, data_len // num_channels,
+        b"data", data_len,
+    )
+
+# Recorded audio is flushed to disk every 5s of 8 kHz 16-bit audio instead of being held until hang-up
+RECORDING_CHUNK_BYTES = 5 * 8000 * 2
+
+class _WavRecorder:
+    """
+    WAV file written incrementally as recorded chunks arrive. Audio is stored as
+    8-bit mu-law, the same encoding Twilio carries, at half the size of PCM16.
+    The header goes out with zero sizes on the first chunk and the sizes are
+    patched on close().
+    """
+
+    def __init__(self, filename: str):
+        self.filename = filename
+        self._file = None
+        self._num_channels = 1
+        self._data_len = 0
+
+    async def write(self, audio: bytes, sample_rate: int, num_channels: int):
+        if not audio:
+            return
+        if self._file is None:
+            self._file = await aiofiles.open(self.filename, "wb")
+            self._num_channels = num_channels
+            await self._file.write(_mulaw_wav_header(0, sample_rate, num_channels))
+        ulaw = audioop.lin2ulaw(audio, 2)
+        await self._file.write(ulaw)
+        self._data_len += len(ulaw)
+
+    async def close(self):
+        if self._file is None:
+            return
+        # RIFF size at byte 4, fact sample count at 46, data size at 54
+        await self._file.seek(4)
+        await self._file.write(struct.pack("<I", 50 + self._data_len))
+        await self._file.seek(46)
+        await self._file.write(struct.pack("<I", self._data_len // self._num_channels))
+        await self._file.seek(54)
+        await self._file.write(struct.pack("<I", self._data_len))
+        await self._file.close()
+        self._file = None
+        logger.info(f"Merged audio saved to {self.filename}")
+        print(f"Merged audio saved to {self.filename}")
+
+def _make_cartesia_tts(language: Optional[str], accent: Optional[str]) -> CartesiaTTSService:
+    logger.info("Initializing CartesiaTTSService.")
+    selected_voice_id = _CARTESIA_VOICES.get((language, accent), DEFAULT_CARTESIA_VOICE_ID)
+    logger.info(f"Using Cartesia voice_id: {selected_voice_id} for language '{language}' and accent '{accent}'")
+
+    return CartesiaTTSService(
+        api_key=os.getenv("CARTESIA_API_KEY"),
+        voice_id=selected_voice_id,
+        push_silence_after_stop=True,
+        text_filter=_TTS_TEXT_FILTER,
+    )
+
+def _make_elevenlabs_tts(language: Optional[str], accent: Optional[str]) -> ElevenLabsTTSService:
+    logger.info("Initializing ElevenLabsTTSService.")
+    selected_voice_id = _ELEVENLABS_VOICES.get((language, accent), DEFAULT_ELEVENLABS_VOICE_ID)
+    logger.info(f"Using ElevenLabs voice_id: {selected_voice_id} for language '{language}' and accent '{accent}'")
+
+    return ElevenLabsTTSService(
+        api_key=os.getenv("ELEVENLABS_API_KEY"),
+        voice_id=selected_voice_id,
+        voice_settings={
+            "stability": 0.5,
+            "similarity_boost": 0.5,
+            "style": 0.5,
+            "auto_mode": True,
+            "optimize_streaming_latency": "2"
+        },
+        model="eleven_flash_v2_5",
+        sample_rate=16000,
+        text_filter=_TTS_TEXT_FILTER,
+    )
+
+_TTS_FACTORIES = {
+    "cartesia": _make_cartesia_tts,
+    "elevenlabs": _make_elevenlabs_tts,
+}
+
+# The provider is resolved once per process. API keys are still read when each service
+# is built, since the API server can update them in os.environ at runtime.
+_TTS_PROVIDER = os.getenv("TTS_PROVIDER", "elevenlabs").lower()
+logger.info(f"TTS_PROVIDER set to: {_TTS_PROVIDER}")
+if _TTS_PROVIDER not in _TTS_FACTORIES:
+    logger.error(f"Unsupported TTS_PROVIDER: {_TTS_PROVIDER}. Defaulting to ElevenLabs.")
+_TTS_FACTORY = _TTS_FACTORIES.get(_TTS_PROVIDER, _make_elevenlabs_tts)
+
+def warmup_shared():
+    """Load process-wide resources (currently the Silero VAD model) ahead of the first call"""
+    _get_vad_analyzer()
+
+class FastTwilioFrameSerializer(TwilioFrameSerializer):
+    """
+    TwilioFrameSerializer with a cheaper path for media events.
+
+    Twilio sends and receives ~50 media messages per second per call. Incoming
+    ones are parsed with orjson and their payload base64-decoded without an extra
+    str->bytes copy; outgoing ones only differ in their payload, so the JSON
+    around it is built once per stream. Everything other than audio (clear, DTMF,
+    transport messages) falls back to the base class.
+    """
+
+    def __init__(self, stream_sid: str, **kwargs):
+        super().__init__(stream_sid, **kwargs)
+        # '{"event":"media","streamSid":"..."' + ',"media":{"payload":"' ... '"}}'
+        self._media_prefix = orjson.dumps({"event": "media", "streamSid": stream_sid}).decode("utf-8")[:-1] + ',"media":{"payload":"'
+
+    async def serialize(self, frame):
+        if isinstance(frame, AudioRawFrame):
+            serialized_data = await pcm_to_ulaw(
+                frame.audio, frame.sample_rate, self._twilio_sample_rate, self._resampler
+            )
+            # Base64 output never needs JSON escaping. The serializer type is TEXT, so hand the websocket a str
+            return f'{self._media_prefix}{binascii.b2a_base64(serialized_data, newline=False).decode("ascii")}"}}}}'
+        return await super().serialize(frame)
+
+    async def deserialize(self, data):
+        message = orjson.loads(data)
+        if message.get("event") != "media":
+            return await super().deserialize(data)
+
+        payload = binascii.a2b_base64(message["media"]["payload"])
+        deserialized_data = await ulaw_to_pcm(
+            payload, self._twilio_sample_rate, self._sample_rate, self._resampler
+        )
+        return InputAudioRawFrame(
+            audio=deserialized_data, num_channels=1, sample_rate=self._sample_rate
+        )
 
-        return messages
+class _Session:
+    """Per-connection pipeline state, with the transport/audio event handlers as bound methods"""
+    __slots__ = ("audiobuffer", "recorder", "messages", "task", "context_aggregator")
+
+    def __init__(self, audiobuffer: Optional[AudioBufferProcessor], recorder: Optional[_WavRecorder],
+                 messages: list, task: PipelineTask, context_aggregator):
+        self.audiobuffer = audiobuffer
+        self.recorder = recorder
+        self.messages = messages
+        self.task = task
+        self.context_aggregator = context_aggregator
+
+    async def on_audio_data(self, buffer, audio, sample_rate, num_channels):
+        await self.recorder.write(audio, sample_rate, num_channels)
+
+    async def on_client_connected(self, transport, client):
+        if self.audiobuffer:
+            await self.audiobuffer.start_recording()
+        self.messages.append({"role": "system", "content": "Please introduce yourself to the user."})
+        await self.task.queue_frames([self.context_aggregator.user().get_context_frame()])
+
+    async def on_client_disconnected(self, transport, client):
+        await self.task.cancel()
 
 class VoiceAgent:
     def __init__(self, agent_id: str, agent_type: str, connection_details: dict, 
                  direction: Direction = None, voice_agent_api_args: dict = None,
                  language: Optional[str] = None, accent: Optional[str] = None,
-                 audio_file_name: Optional[str] = None):
+                 audio_file_name: Optional[str] = None, record_audio: bool = False):
         """
         Initialize a voice agent for testing.
         
@@ -90,6 +346,8 @@ class VoiceAgent:
             language (Optional[str]): Desired language for TTS.
             accent (Optional[str]): Desired accent for TTS.
             audio_file_name (Optional[str]): Desired filename for the saved audio.
+            record_audio (bool): Buffer and save the call audio. When False the
+                recording stage is left out of the pipeline entirely.
         """
         logger.info(f"Initializing VoiceAgent with ID: {agent_id}, Language: {language}, Accent: {accent}")
         self.agent_id = agent_id
@@ -99,11 +357,17 @@ class VoiceAgent:
         self.connection = None
         self.persona = None
         self.scenario = None
+        self._system_prompt = _SYSTEM_PROMPT_TEMPLATE.format(persona=None, scenario=None)
+        self._base_messages = [{"role": "system", "content": self._system_prompt}]
+        self._prebuilt_context = None
+        # Sent with every completion as extra_body; filled in by set_persona_and_scenario
+        self._llm_extra_body: dict = {}
         self.transcript_handler = TranscriptHandler()
         self.twilio_client = None
         self.call_sid = None
         self.voice_agent_api_kwargs = voice_agent_api_args
         self.audio_file_name = audio_file_name
+        self.record_audio = record_audio
         
         # Validate connection details for phone type agents
         if self.agent_type == "phone" and direction == Direction.INBOUND:
@@ -112,117 +376,89 @@ class VoiceAgent:
                 logger.error(error_msg)
                 raise ValueError(error_msg)
 
-        self.tools = [
-            ChatCompletionToolParam(
-                type="function",
-                function={
-                    "name": "call_end",
-                    "description": "End the current conversation",
-                    "parameters": {
-                        "type": "object",
-                        "properties": {},
-                        "required": []
-                    }
-                }
-            )
-            ]
-        
-        # Initialize services
-        self.llm = OpenAILLMService(api_key=os.getenv("OPENAI_API_KEY"), model="gpt-4o")
-        self.stt = DeepgramSTTService(api_key=os.getenv("DEEPGRAM_API_KEY"), audio_passthrough=True)
-        
-        # Determine TTS provider from environment variable
-        tts_provider = os.getenv("TTS_PROVIDER", "elevenlabs").lower()
-        logger.info(f"TTS_PROVIDER set to: {tts_provider}")
-
-        if tts_provider == "cartesia":
-            logger.info("Initializing CartesiaTTSService.")
-            # Determine Cartesia voice_id based on language and accent
-            selected_voice_id = DEFAULT_CARTESIA_VOICE_ID
-            if language and accent:
-                if language in SUPPORTED_LANGUAGES_ACCENTS and accent in SUPPORTED_LANGUAGES_ACCENTS.get(language, []):
-                    selected_voice_id = CARTESIA_VOICE_MAPPING.get((language, accent), DEFAULT_CARTESIA_VOICE_ID)
-                    logger.info(f"Using Cartesia voice_id: {selected_voice_id} for language '{language}' and accent '{accent}'")
-                else:
-                    logger.warning(f"Language '{language}' or accent '{accent}' not in supported list or Cartesia mapping. Using default voice_id: {DEFAULT_CARTESIA_VOICE_ID}")
-            else:
-                logger.info(f"Language or accent not provided. Using default Cartesia voice_id: {DEFAULT_CARTESIA_VOICE_ID}")
-
-            self.tts = CartesiaTTSService(
-                api_key=os.getenv("CARTESIA_API_KEY"),
-                voice_id=selected_voice_id, # Use selected_voice_id
-                push_silence_after_stop=True,
-            )
-        elif tts_provider == "elevenlabs":
-            logger.info("Initializing ElevenLabsTTSService.")
-            # Determine ElevenLabs voice_id based on language and accent
-            selected_voice_id = DEFAULT_ELEVENLABS_VOICE_ID
-            if language and accent:
-                if language in SUPPORTED_LANGUAGES_ACCENTS and accent in SUPPORTED_LANGUAGES_ACCENTS.get(language, []):
-                    selected_voice_id = ELEVENLABS_VOICE_MAPPING.get((language, accent), DEFAULT_ELEVENLABS_VOICE_ID)
-                    logger.info(f"Using ElevenLabs voice_id: {selected_voice_id} for language '{language}' and accent '{accent}'")
-                else:
-                    logger.warning(f"Language '{language}' or accent '{accent}' not in supported list or mapping. Using default voice_id: {DEFAULT_ELEVENLABS_VOICE_ID}")
-            else:
-                logger.info(f"Language or accent not provided. Using default ElevenLabs voice_id: {DEFAULT_ELEVENLABS_VOICE_ID}")
-
-            self.tts = ElevenLabsTTSService(
-                api_key=os.getenv("ELEVENLABS_API_KEY"),
-                voice_id=selected_voice_id, 
-                voice_settings={ 
-                    "stability": 0.5,
-                    "similarity_boost": 0.5,
-                    "style": 0.5,
-                    "auto_mode": True,
-                    "optimize_streaming_latency": "2"
-                },
-                model="eleven_flash_v2_5",
-                sample_rate=16000,
-            )
-        else:
-            logger.error(f"Unsupported TTS_PROVIDER: {tts_provider}. Defaulting to ElevenLabs.")
-            # Fallback to ElevenLabs if provider is unknown (or handle error differently)
-            selected_voice_id = DEFAULT_ELEVENLABS_VOICE_ID # Default voice for fallback
-            self.tts = ElevenLabsTTSService(
-                api_key=os.getenv("ELEVENLABS_API_KEY"),
-                voice_id=selected_voice_id,
-                model="eleven_flash_v2_5", # Ensure model is specified
-                sample_rate=16000, # Ensure sample_rate is specified
-                voice_settings={ # Default settings for fallback
-                    "stability": 0.5,
-                    "similarity_boost": 0.5,
-                    "style": 0.5,
-                    "auto_mode": True,
-                    "optimize_streaming_latency": "2"
-                }
-            )
+        self.tools = [_CALL_END_TOOL]
+        self._tools_json = json.dumps(self.tools, sort_keys=True)
         
-        self.llm.register_function("call_end", self.end_call)
+        # LLM/STT/TTS services are built lazily on first use (see the properties below)
+        self.language = language
+        self.accent = accent
 
         logger.info(f"VoiceAgent initialized with type: {agent_type}, direction: {direction.value if direction else None}")
 
-    def __get_end_call_twiml(self):
-        return """
-        <Response>
-            <Hangup />
-        </Response>
+    @cached_property
+    def llm(self) -> OpenAILLMService:
+        """OpenAI LLM service, built on first use"""
+        # The outer `extra` dict is copied by pydantic but self._llm_extra_body is kept by
+        # reference, so a later set_persona_and_scenario still updates the cache key
+        llm = OpenAILLMService(
+            api_key=os.getenv("OPENAI_API_KEY"),
+            model="gpt-4o",
+            params=OpenAILLMService.InputParams(extra={"extra_body": self._llm_extra_body})
+        )
+        llm.register_function("call_end", self.end_call)
+        return llm
+
+    @cached_property
+    def stt(self) -> DeepgramSTTService:
+        """Deepgram STT service, built on first use"""
+        return DeepgramSTTService(api_key=os.getenv("DEEPGRAM_API_KEY"), audio_passthrough=True)
+
+    @cached_property
+    def tts(self):
+        """TTS service for the configured provider, language and accent, built on first use"""
+        return _TTS_FACTORY(self.language, self.accent)
+
+    async def warmup(self):
         """
-    
+        Build the LLM/STT/TTS services and the next call's LLM context, so the first
+        turn of the call doesn't pay for their construction. No network requests are
+        made here: the pipeline runs on the test server's loop, and connections opened
+        on the caller's loop can't be reused there. Failures are logged and otherwise
+        ignored; the call will build lazily.
+        """
+        logger.info(f"Warming up services for agent {self.agent_id}")
+        try:
+            # Accessing the cached properties constructs the services
+            self.stt
+            self.tts
+            self._prebuilt_context = self._build_context_aggregator()
+        except Exception as e:
+            logger.warning(f"Warmup failed for agent {self.agent_id}: {str(e)}")
+
     async def end_call(self, function_name, tool_call_id, args, llm, context, result_callback):
         # Implement the logic to end the call here
         logger.info(f"Ending call {self.call_sid}")
-        self.twilio_client.calls(self.call_sid).update(twiml=self.__get_end_call_twiml())
+        self.twilio_client.calls(self.call_sid).update(twiml=_END_CALL_TWIML)
 
     def get_outbound_call_data(self):
         return self.voice_agent_api_kwargs
     
     def reset_transcript_handler(self):
+        # A new handler rather than clearing this one in place: the test runner keeps the previous
+        # call's handler until that call's completion callback has read its transcript
         self.transcript_handler = TranscriptHandler()
         
     def set_persona_and_scenario(self, persona: str, scenario: str):
         """Set the agent's persona and scenario"""
         self.persona = persona
         self.scenario = scenario
+        # Built here rather than per connection, persona/scenario don't change mid-call
+        self._system_prompt = _SYSTEM_PROMPT_TEMPLATE.format(persona=persona, scenario=scenario)
+        self._base_messages = [{"role": "system", "content": self._system_prompt}]
+        # Any context prebuilt by warmup() carries the old prompt
+        self._prebuilt_context = None
+        # Calls with the same static prefix (system prompt + tools) share a key, so OpenAI
+        # routes them to a server with that prefix already cached and skips re-prefilling it
+        self._llm_extra_body["prompt_cache_key"] = hashlib.sha256(
+            f"{self._system_prompt}\n{self._tools_json}".encode("utf-8")
+        ).hexdigest()
+
+    def _build_context_aggregator(self):
+        """Return a fresh (messages, context_aggregator) pair seeded with the system prompt"""
+        # Shallow copy: the context appends to the list, the system message itself is never modified
+        messages = list(self._base_messages)
+        context = OpenAILLMContext(messages, tools=self.tools)
+        return messages, self.llm.create_context_aggregator(context)
 
     async def handle_websocket_connection(self, websocket: WebSocket, stream_sid: str, twilio_client: Client = None, call_sid: str = None):
         """Handle WebSocket connection for the agent"""
@@ -237,29 +473,26 @@ class VoiceAgent:
                 audio_out_enabled=True,
                 add_wav_header=False,
                 vad_enabled=True,
-                vad_analyzer=SileroVADAnalyzer(),
+                vad_analyzer=_get_vad_analyzer(),
                 vad_audio_passthrough=True,
-                serializer=TwilioFrameSerializer(stream_sid),
+                serializer=FastTwilioFrameSerializer(stream_sid),
             ),
         )
 
         transcript = TranscriptProcessor()
         
-        # Set up the agent's context with persona and scenario
-        system_prompt = f"""You are an AI agent with the following persona:
-        {self.persona}
-
-        Current scenario:
-        {self.scenario}
-
-        Your responses will be converted to audio, so avoid using special characters."""
-
-        messages = [{"role": "system", "content": system_prompt}]
-        context = OpenAILLMContext(messages, tools=self.tools)
-
-        context_aggregator = self.llm.create_context_aggregator(context)
-
-        audiobuffer = AudioBufferProcessor(sample_rate=44100, num_channels=2, buffer_size=0)
+        # Set up the agent's context with persona and scenario, using the one prebuilt by
+        # warmup() if available. The context is mutated during the call, so it's used only once.
+        messages, context_aggregator = self._prebuilt_context or self._build_context_aggregator()
+        self._prebuilt_context = None
+
+        # Record at the wire format (8 kHz mono, user and bot mixed) rather than upsampling to 44.1 kHz stereo,
+        # handing chunks to the recorder as they fill up
+        audiobuffer = None
+        recorder = None
+        if self.record_audio:
+            audiobuffer = AudioBufferProcessor(sample_rate=8000, num_channels=1, buffer_size=RECORDING_CHUNK_BYTES)
+            recorder = _WavRecorder(self._recording_path())
 
         pipeline = Pipeline([
             transport.input(),
@@ -270,7 +503,7 @@ class VoiceAgent:
             self.tts,
             transport.output(),
             transcript.assistant(),
-            audiobuffer,
+            *([audiobuffer] if audiobuffer else []),
             context_aggregator.assistant(),
         ])
 
@@ -286,56 +519,39 @@ class VoiceAgent:
             ),
         )
 
-        async def save_audio(audio: bytes, sample_rate: int, num_channels: int):
-            if len(audio) > 0:
-                if self.audio_file_name:
-                    if not self.audio_file_name.lower().endswith(".wav"):
-                        base_filename = f"{self.audio_file_name}.wav"
-                    else:
-                        base_filename = self.audio_file_name
-                else:
-                    base_filename = f"conversation_recording_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.wav"
-                
-                # Ensure the recordings directory exists
-                recordings_dir = "recordings"
-                os.makedirs(recordings_dir, exist_ok=True)
-                
-                filename = os.path.join(recordings_dir, base_filename)
-
-                with io.BytesIO() as buffer:
-                    with wave.open(buffer, "wb") as wf:
-                        wf.setsampwidth(2)
-                        wf.setnchannels(num_channels)
-                        wf.setframerate(sample_rate)
-                        wf.writeframes(audio)
-                        
-                    async with aiofiles.open(filename, "wb") as file:
-                        await file.write(buffer.getvalue())
-                logger.info(f"Merged audio saved to {filename}")
-                print(f"Merged audio saved to {filename}")
-
-        # Handle the recorded audio chunks
-        @audiobuffer.event_handler("on_audio_data")
-        async def on_audio_data(buffer, audio, sample_rate, num_channels):
-            await save_audio(audio, sample_rate, num_channels)
-
-
-        @transport.event_handler("on_client_connected")
-        async def on_client_connected(transport, client):
-            await audiobuffer.start_recording()
-            messages.append({"role": "system", "content": "Please introduce yourself to the user."})
-            await task.queue_frames([context_aggregator.user().get_context_frame()])
-
-        @transport.event_handler("on_client_disconnected")
-        async def on_client_disconnected(transport, client):
-            await task.cancel()
-
-        @transcript.event_handler("on_transcript_update")
-        async def handle_update(processor, frame):
-            await self.transcript_handler.on_transcript_update(processor, frame)
-
-        runner = PipelineRunner(handle_sigint=False, force_gc=True)
-        await runner.run(task)
+        # Event handlers are bound methods on the per-connection session rather than closures
+        session = _Session(audiobuffer, recorder, messages, task, context_aggregator)
+        if audiobuffer:
+            audiobuffer.event_handler("on_audio_data")(session.on_audio_data)
+        transport.event_handler("on_client_connected")(session.on_client_connected)
+        transport.event_handler("on_client_disconnected")(session.on_client_disconnected)
+        transcript.event_handler("on_transcript_update")(self.transcript_handler.on_transcript_update)
+
+        try:
+            # A runner per call: PipelineRunner binds to the loop it is created on, and only
+            # forgets a task when it finishes cleanly. Forced gc.collect() after the call is
+            # left off; generational GC reclaims the pipeline objects.
+            await PipelineRunner(handle_sigint=False, force_gc=False).run(task)
+        finally:
+            # The final chunk is flushed when the pipeline stops, so the sizes can be patched now
+            if recorder:
+                await recorder.close()
+
+    def _recording_path(self) -> str:
+        """Path under recordings/ for this call's WAV file, creating the directory if needed"""
+        if self.audio_file_name:
+            if not self.audio_file_name.lower().endswith(".wav"):
+                base_filename = f"{self.audio_file_name}.wav"
+            else:
+                base_filename = self.audio_file_name
+        else:
+            base_filename = f"conversation_recording_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.wav"
+        
+        # Ensure the recordings directory exists
+        recordings_dir = "recordings"
+        os.makedirs(recordings_dir, exist_ok=True)
+        
+        return os.path.join(recordings_dir, base_filename)
 
     def initialize_connection(self):
         """Establish connection with the agent"""
@@ -388,7 +604,9 @@ class VoiceAgent:
     def get_transcript(self):
         """Get the conversation transcript"""
         messages =  self.transcript_handler.get_messages()
-        logger.info(f"Transcript messages: {messages}")
+        # Full transcript only at DEBUG, formatted lazily so it isn't copied into a discarded log line
+        logger.info(f"Transcript messages: {len(messages)} characters")
+        logger.debug("Transcript messages: %s", messages)
         return messages
 
     def make_call(self, phone_number: str):
@@ -1,13 +1,46 @@
+import asyncio
 from dataclasses import dataclass
-from openai import AsyncOpenAI
+import httpx
+import orjson
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient
 from pydantic import BaseModel
-from typing import Literal, List
+from typing import Literal, List, Optional
 import logging
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+EVALUATION_SYSTEM_PROMPT = ("You are an expert in evaluating transcripts between customers and agents. "
+                            "Evaluate the conversation for all the following metrics. For each metric, "
+                            "provide a pass/fail result and a brief reason.")
+
+# Every shard of an evaluation shares the system prompt + conversation prefix, so one cache key lets them hit the same prefix cache
+EVALUATION_PROMPT_CACHE_KEY = "voxhog-eval-v1"
+
+_shared_client: Optional[AsyncOpenAI] = None
+_shared_client_loop: Optional[asyncio.AbstractEventLoop] = None
+
+def get_shared_client() -> AsyncOpenAI:
+    """
+    Return the AsyncOpenAI client shared by all evaluators, so concurrent evaluation
+    requests are multiplexed over one kept-alive HTTP/2 connection pool instead of
+    each evaluator doing its own TLS handshakes. httpx pools belong to the event loop
+    they were opened on, so a new client is created if called from a different loop.
+    """
+    global _shared_client, _shared_client_loop
+    loop = asyncio.get_running_loop()
+    if _shared_client is None or _shared_client_loop is not loop:
+        logger.debug("Creating shared AsyncOpenAI client for evaluators")
+        _shared_client = AsyncOpenAI(
+            http_client=DefaultAsyncHttpxClient(
+                http2=True,
+                limits=httpx.Limits(max_connections=64, max_keepalive_connections=32)
+            )
+        )
+        _shared_client_loop = loop
+    return _shared_client
+
 class VoiceAgentEvaluation(BaseModel):
     name: str
     result: Literal["pass", "fail"]
@@ -23,23 +56,54 @@ class VoiceAgentMetric:
         logger.debug(f"Created new VoiceAgentMetric: {name}")
 
 class VoiceAgentEvaluator:
-    def __init__(self, model: str):
+    def __init__(self, model: str, metrics_per_request: int = 1):
+        """
+        Args:
+            model (str): OpenAI model used to grade the conversation
+            metrics_per_request (int): How many metrics each concurrent request evaluates
+        """
         logger.info(f"Initializing VoiceAgentEvaluator with model: {model}")
-        self.client = AsyncOpenAI()
         self.model = model
+        self.metrics_per_request = max(1, metrics_per_request)
         self.metrics = []  # List of VoiceAgentMetric objects
         self.evaluations = []  # List to store evaluation results
         logger.debug("VoiceAgentEvaluator initialized successfully")
 
+    @property
+    def client(self) -> AsyncOpenAI:
+        """The shared client for the running event loop"""
+        return get_shared_client()
+
     def add_metric(self, metric: VoiceAgentMetric):
         """Adds a VoiceAgentMetric to the evaluation list."""
         logger.info(f"Adding new metric: {metric.name}")
         self.metrics.append(metric)
         logger.debug(f"Current number of metrics: {len(self.metrics)}")
 
+    async def _evaluate_metrics(self, metrics: List[tuple], conversation_json: str) -> VoiceAgentEvaluationResults:
+        """Evaluate one shard of (index, metric) pairs in a single API call"""
+        metrics_prompt = "\n".join([f"Metric {i+1}: {m.name}\n{m.prompt}" for i, m in metrics])
+        logger.debug("Metrics prompt: %s", metrics_prompt)
+
+        # Conversation goes before the metrics so every shard shares the same prompt prefix
+        messages = [
+            {"role": "system", "content": EVALUATION_SYSTEM_PROMPT},
+            {"role": "user", "content": f"Conversation Data: {conversation_json}\n\nMetrics to evaluate:\n{metrics_prompt}"}
+        ]
+
+        response = await self.client.beta.chat.completions.parse(
+            model=self.model,
+            messages=messages,
+            temperature=0,
+            response_format=VoiceAgentEvaluationResults,
+            extra_body={"prompt_cache_key": EVALUATION_PROMPT_CACHE_KEY}
+        )
+        return response.choices[0].message.parsed
+
     async def evaluate_voice_conversation(self, conversation_data: dict) -> List[VoiceAgentEvaluation]:
         """
-        Evaluate the voice conversation across all metrics in a single API call.
+        Evaluate the voice conversation across all metrics, issuing one API call per
+        `metrics_per_request` metrics concurrently and merging the results.
         Returns a list of VoiceAgentEvaluation objects.
         """
         logger.info(f"Number of metrics to evaluate: {len(self.metrics)}")
@@ -49,26 +113,19 @@ class VoiceAgentEvaluator:
                 logger.warning("No metrics to evaluate, returning empty list")
                 return VoiceAgentEvaluationResults(evaluations=[])
                 
-            metrics_prompt = "\n".join([f"Metric {i+1}: {m.name}\n{m.prompt}" for i, m in enumerate(self.metrics)])
-            logger.info(f"Generated metrics prompt with {len(self.metrics)} metrics")
-            logger.debug(f"Metrics prompt: {metrics_prompt}")
-            
-            messages = [
-                {"role": "system", "content": "You are an expert in evaluating transcripts between customers and agents. "
-                                            "Evaluate the conversation for all the following metrics. For each metric, "
-                                            "provide a pass/fail result and a brief reason."},
-                {"role": "user", "content": f"Metrics to evaluate:\n{metrics_prompt}\n\nConversation Data: {conversation_data}"}
-            ]
-            
-            response = await self.client.beta.chat.completions.parse(
-                model=self.model,
-                messages=messages,
-                temperature=0,
-                response_format=VoiceAgentEvaluationResults
+            # Serialized once as real JSON (rather than a dict repr) and shared by every shard
+            conversation_json = orjson.dumps(conversation_data, default=str).decode("utf-8")
+
+            indexed_metrics = list(enumerate(self.metrics))
+            shards = [indexed_metrics[i:i + self.metrics_per_request]
+                      for i in range(0, len(indexed_metrics), self.metrics_per_request)]
+            logger.info(f"Evaluating {len(self.metrics)} metrics in {len(shards)} concurrent requests")
+
+            shard_results = await asyncio.gather(*[self._evaluate_metrics(shard, conversation_json) for shard in shards])
+            self.evaluations = VoiceAgentEvaluationResults(
+                evaluations=[evaluation for result in shard_results for evaluation in result.evaluations]
             )
-            parsed = response.choices[0].message.parsed
-            logger.info(f"Received response from OpenAI {parsed} type of {type(parsed)}")
-            self.evaluations = parsed #VoiceAgentEvaluationResults(parsed)
+            logger.info(f"Received responses from OpenAI {self.evaluations}")
             
             # Log individual evaluation results
             for eval in self.evaluations.evaluations:
@@ -78,4 +135,4 @@ class VoiceAgentEvaluator:
             
         except Exception as e:
             logger.error(f"Error during voice conversation evaluation: {str(e)}", exc_info=True)
-            raise 
\ No newline at end of file
+            raise
\ No newline at end of file
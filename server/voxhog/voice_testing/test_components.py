@@ -31,12 +31,11 @@ class UserPersona:
             raise
 
     def get_persona_attributes(self) -> dict:
-        """Get the persona's attributes"""
-        attributes = {
+        """Get the persona's attributes as a fresh dict"""
+        return {
             "name": self.name,
             "prompt": self.prompt
         }
-        return attributes
 
 class Scenario:
     def __init__(self, name: str, prompt: str):
@@ -70,11 +69,7 @@ class TestCase:
 
     def validate(self) -> bool:
         """Validate that the test case is properly configured"""
-        is_valid = all([
-            self.name,
-            self.scenario,
-            self.user_persona
-        ])
+        is_valid = bool(self.name and self.scenario and self.user_persona)
         
         if not is_valid:
             logger.warning(f"Test case '{self.name}' validation failed")
@@ -82,9 +77,9 @@ class TestCase:
         return is_valid
 
     def get_test_parameters(self) -> dict:
-        """Get all test parameters in a dictionary format"""
-        logger.info(f"Retrieving parameters for test case: {self.name}")
-        parameters = {
+        """Get all test parameters as a fresh dict, so callers can't mutate shared state"""
+        logger.debug(f"Retrieving parameters for test case: {self.name}")
+        return {
             "name": self.name,
             "scenario": {
                 "name": self.scenario.name,
@@ -93,4 +88,3 @@ class TestCase:
             "persona": self.user_persona.get_persona_attributes(),
             "evaluator": self.evaluator
         }
-        return parameters 
\ No newline at end of file
@@ -1,16 +1,21 @@
 import logging
+from collections import Counter
+from dataclasses import dataclass
 from typing import List, Optional, Dict
 import uuid
-import pandas as pd
-from ..voice_agent import Direction, VoiceAgent
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
+from ..voice_agent import Direction, TranscriptHandler, VoiceAgent, warmup_shared
 from .test_components import TestCase
 from .testing_server import TestingServer
 from ..voice_agent_evaluation import VoiceAgentEvaluator
 import threading
 import uvicorn
-import time
+import uvloop
 import asyncio
-import requests
+import httpx
+import orjson
 import os
 from dotenv import load_dotenv
 
@@ -21,6 +26,65 @@ load_dotenv()
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+_agent_api_client: Optional[httpx.AsyncClient] = None
+_agent_api_client_loop: Optional[asyncio.AbstractEventLoop] = None
+
+def _get_agent_api_client() -> httpx.AsyncClient:
+    """
+    Return the pooled client used for voice agent API calls, shared across runners so
+    consecutive tests reuse the kept-alive connection instead of a new TLS handshake
+    per call. Like the evaluator's shared client, it is recreated for a different loop.
+    """
+    global _agent_api_client, _agent_api_client_loop
+    loop = asyncio.get_running_loop()
+    if _agent_api_client is None or _agent_api_client_loop is not loop:
+        _agent_api_client = httpx.AsyncClient(
+            http2=True,  # negotiated via ALPN; falls back to HTTP/1.1 if the API doesn't offer it
+            timeout=30,
+            limits=httpx.Limits(max_connections=8, max_keepalive_connections=4)
+        )
+        _agent_api_client_loop = loop
+    return _agent_api_client
+
+def _set_result_if_pending(future: asyncio.Future, result):
+    """Resolve a future unless it already finished (e.g. cancelled by a timeout)"""
+    if not future.done():
+        future.set_result(result)
+
+class _ReadySignalingServer(uvicorn.Server):
+    """uvicorn server that sets a threading.Event once startup has finished and its sockets are listening"""
+
+    def __init__(self, config: uvicorn.Config, ready: threading.Event):
+        super().__init__(config)
+        self._ready = ready
+
+    async def startup(self, sockets=None):
+        await super().startup(sockets=sockets)
+        self._ready.set()
+
+SERVER_STARTUP_TIMEOUT = 30
+
+# Pending Twilio status callbacks; beyond this /callback sheds intermediate statuses with a 503
+# and holds terminal ones until there is room, since Twilio does not retry failed callbacks
+CALLBACK_QUEUE_MAXSIZE = 256
+
+# Most callbacks handled per consumer pass before it yields to the server loop
+CALLBACK_BATCH_SIZE = 64
+
+REPORT_COLUMNS = ["test_name", "test_description", "transcript", "evaluations", "pass_count",
+                  "fail_count", "total_evaluations", "pass_rate", "recording_url"]
+
+@dataclass(slots=True)
+class _CallContext:
+    """
+    State captured for one placed call, keyed by call SID, so a late completion callback
+    reads this call's transcript and recording rather than whatever the agent holds by then.
+    """
+    test_case: TestCase
+    time_limit: int
+    audio_file_name: Optional[str]
+    transcript_handler: TranscriptHandler
+
 class VoiceTestRunner:
     def __init__(self, agent: VoiceAgent):
         """
@@ -33,14 +97,20 @@ class VoiceTestRunner:
         logger.info(f"VoiceTestRunner __init__ called for agent: {agent.agent_id}")
         self.agent = agent
         self.test_cases: List[TestCase] = []
-        self.current_test: Optional[TestCase] = None
         self.results = []
         self.test_evaluations: Dict[str, dict] = {}
-        self.callback_queue = asyncio.Queue()
+        # Queues bind to a loop on first use, not at construction. callback_queue is only ever used
+        # on server_loop (the /callback handler and _post_callback_consumer). call_sid_queue is
+        # awaited on the loop running the tests; the server thread feeds it via call_soon_threadsafe.
+        self.callback_queue = asyncio.Queue(maxsize=CALLBACK_QUEUE_MAXSIZE)
         self.call_sid_queue = asyncio.Queue()
-        self.server_loop = asyncio.new_event_loop()
+        # The server thread runs on its own libuv-backed loop, matching the main API server's loop="uvloop"
+        self.server_loop = uvloop.new_event_loop()
         self.call_completion_futures: Dict[str, asyncio.Future] = {}
+        self._call_contexts: Dict[str, _CallContext] = {}
+        self._agent_api_target: Optional[tuple] = None
         self.uvicorn_server_instance: Optional[uvicorn.Server] = None
+        self._server_ready = threading.Event()
         
         logger.info("Initializing TestingServer in VoiceTestRunner.")
         self.server = TestingServer(self.agent, self.callback_queue, self.call_sid_queue)
@@ -63,9 +133,18 @@ class VoiceTestRunner:
         self.server_thread.start()
         logger.info("Server thread started in VoiceTestRunner.")
         
-        # Give server time to start up
-        logger.info("Sleeping for 4 seconds to allow server startup in VoiceTestRunner.")
-        time.sleep(4) # Consider using a more robust check for server readiness
+        # Load the shared VAD model while the server starts, so library users who don't
+        # go through the API server's startup hook don't pay for it on the first call
+        warmup_shared()
+
+        # Wait until uvicorn is actually listening rather than sleeping a fixed time
+        logger.info("Waiting for server startup in VoiceTestRunner.")
+        server_ready = self._server_ready.wait(timeout=SERVER_STARTUP_TIMEOUT)
+        if not (server_ready and self.uvicorn_server_instance and self.uvicorn_server_instance.started):
+            error_msg = f"Testing server failed to start within {SERVER_STARTUP_TIMEOUT} seconds"
+            logger.error(error_msg)
+            self.server.cleanup()
+            raise RuntimeError(error_msg)
         logger.info(f"Server started at {base_url} in VoiceTestRunner.")
         # Update agent connection details with server URL
         if hasattr(self.server, 'base_url'):
@@ -92,13 +171,13 @@ class VoiceTestRunner:
             "evaluator_results": []
         }
         
-        logger.info(f"Evaluating test case: {test_case.name} with evaluator: {test_case.evaluator}")
+        logger.info("Evaluating test case: %s with evaluator: %s", test_case.name, test_case.evaluator)
         
         # Run voice agent evaluator
         try:
             if hasattr(test_case, 'evaluator') and test_case.evaluator:
                 evaluator_response = await test_case.evaluator.evaluate_voice_conversation({"transcript": evaluation_data["transcript"]})
-                logger.info(f"Received evaluator response: {evaluator_response}")
+                logger.info("Received evaluator response: %s", evaluator_response)
                 
                 # Store the evaluations in the results
                 if hasattr(evaluator_response, 'evaluations'):
@@ -118,6 +197,27 @@ class VoiceTestRunner:
         
         return results
 
+    def _get_agent_api_target(self) -> tuple:
+        """
+        Resolve the voice agent API URL and request headers once per runner. Not cached at
+        import: the API server can update these environment variables while it is running.
+        """
+        if self._agent_api_target is None:
+            auth_token = os.getenv("VOICE_AGENT_API_AUTH_TOKEN")
+            if not auth_token:
+                raise ValueError("VOICE_AGENT_API_AUTH_TOKEN environment variable not set")
+
+            api_url = os.getenv("VOICE_AGENT_API")
+            if not api_url:
+                raise ValueError("VOICE_AGENT_API environment variable not set")
+
+            headers = {
+                'Authorization': f'Bearer {auth_token}',
+                'Content-Type': 'application/json',
+            }
+            self._agent_api_target = (api_url, headers)
+        return self._agent_api_target
+
     async def _initiate_agent_outbound_call(self) -> dict:
         """
         Make an outbound call using the voice agent provider's API.
@@ -128,27 +228,15 @@ class VoiceTestRunner:
         Returns:
             dict: Response from the voice agent provider's API
         """
-        # Update the Twilio phone number webhook URL
-        self.server.update_twilio_phone_number_webhook_url()
+        # Update the Twilio phone number webhook URL; the Twilio client is synchronous, so keep it off the loop
+        await asyncio.to_thread(self.server.update_twilio_phone_number_webhook_url)
         logger.info("Twilio phone number webhook URL updated")
         try:
-            auth_token = os.getenv("VOICE_AGENT_API_AUTH_TOKEN")
-            if not auth_token:
-                raise ValueError("VOICE_AGENT_API_AUTH_TOKEN environment variable not set")
-
-            headers = {
-                'Authorization': f'Bearer {auth_token}',
-                'Content-Type': 'application/json',
-            }
-
+            api_url, headers = self._get_agent_api_target()
             data = self.agent.get_outbound_call_data()
 
-            api_url = os.getenv("VOICE_AGENT_API")
-            if not api_url:
-                raise ValueError("VOICE_AGENT_API environment variable not set")
-
             logger.info(f"Making API request to {api_url}")
-            response = requests.post(f"{api_url}", headers=headers, json=data)
+            response = await _get_agent_api_client().post(api_url, headers=headers, json=data)
 
             if response.status_code == 201:
                 logger.info("Outbound call created successfully")
@@ -164,12 +252,33 @@ class VoiceTestRunner:
 
     async def run_test_case(self, test_case: TestCase, time_limit: int = 60) -> dict:
         """Run a single test case"""
+        call_sid, evaluation_data = await self._run_call(test_case, time_limit)
+        return await self._evaluate_call(test_case, call_sid, evaluation_data)
+
+    async def _evaluate_call(self, test_case: TestCase, call_sid: str, evaluation_data: dict) -> dict:
+        """Evaluate a completed call. Only uses the captured evaluation data, never the live agent."""
+        logger.info(f"Evaluating test_case: {test_case.name} for call_sid: {call_sid}")
+        results = await self.evaluate_test_case(test_case, evaluation_data)
+        logger.info(f"Finished evaluating test_case: {test_case.name} for call_sid: {call_sid}")
+        # Add recording URL to results
+        results["recording_url"] = evaluation_data.get("recording_url", "No recording URL available")
+        self.test_evaluations[call_sid] = results
+        return results
+
+    async def _run_call(self, test_case: TestCase, time_limit: int) -> tuple:
+        """
+        Place the call for a test case and wait for it to complete.
+
+        Returns:
+            tuple: The call SID and the evaluation data captured when the call completed
+        """
         logger.info(f"run_test_case started for test: {test_case.name}")
-        self.current_test = test_case
-        self.current_test_time_limit = time_limit
+        # Only name a recording when the agent will actually write one
+        audio_file_name = f"{uuid.uuid4()}.wav" if self.agent.record_audio else None
         
         try:
-            self.agent.audio_file_name = f"{uuid.uuid4()}.wav"
+            if audio_file_name:
+                self.agent.audio_file_name = audio_file_name
             # Initialize agent connection for this test case
             self.agent.initialize_connection()
             
@@ -182,6 +291,9 @@ class VoiceTestRunner:
             #Always reset the transcript handler for each test case
             self.agent.reset_transcript_handler()
 
+            # Build services and the LLM context before dialing
+            await self.agent.warmup()
+
             # Handle call based on direction
             if self.agent.direction == Direction.INBOUND:
                 phone_number = self.agent.get_phone_number()
@@ -203,6 +315,7 @@ class VoiceTestRunner:
                 # 1. Initiate the outbound call through the agent's API
                 # 2. Wait to receive the call SID through the twilio_callback endpoint
                 logger.info("Initiating outbound test call through agent API")
+                self.server.call_sid_loop = asyncio.get_running_loop()
                 await self._initiate_agent_outbound_call()
                 
                 # Wait for the call SID to be received via the twilio_callback endpoint
@@ -216,38 +329,30 @@ class VoiceTestRunner:
                 
                 logger.info(f"Received call SID for outbound call: {call_sid}")
 
-            # Create future for this call
-            self.call_completion_futures[call_sid] = asyncio.Future()
+            # Create future for this call, bound to this loop; it is resolved from the server thread
+            self._call_contexts[call_sid] = _CallContext(
+                test_case=test_case,
+                time_limit=time_limit,
+                audio_file_name=audio_file_name,
+                transcript_handler=self.agent.transcript_handler
+            )
+            completion = self.call_completion_futures[call_sid] = asyncio.get_running_loop().create_future()
             
             logger.info(f"Waiting for call completion for call_sid: {call_sid} in test_case: {test_case.name}")
             # Wait for call completion and evaluation data
             try:
-
-                #Keep on polling the future until it is done
-                while not self.call_completion_futures[call_sid].done():
-                    await asyncio.sleep(1)
-                evaluation_data = self.call_completion_futures[call_sid].result()
-
-                #evaluation_data = await asyncio.wait_for(self.call_completion_futures[call_sid], timeout= 150)
+                evaluation_data = await asyncio.wait_for(completion, timeout=time_limit + 90)
                 logger.info(f"Received transcript for call {call_sid}")
-                
-                # Evaluate the test case with the complete data
-                logger.info(f"Evaluating test_case: {test_case.name} for call_sid: {call_sid}")
-                results = await self.evaluate_test_case(test_case, evaluation_data)
-                logger.info(f"Finished evaluating test_case: {test_case.name} for call_sid: {call_sid}")
-                # Add recording URL to results
-                results["recording_url"] = evaluation_data.get("recording_url", "No recording URL available")
-                self.test_evaluations[call_sid] = results
-                # Cleanup
-                del self.call_completion_futures[call_sid]
-                return results
+                return call_sid, evaluation_data
                 
             except asyncio.TimeoutError:
                 error_msg = "Timeout waiting for call completion and evaluation"
                 logger.error(error_msg)
-                if call_sid in self.call_completion_futures:
-                    del self.call_completion_futures[call_sid]
                 raise RuntimeError(error_msg)
+            finally:
+                # Cleanup, also when the wait is cancelled
+                self.call_completion_futures.pop(call_sid, None)
+                self._call_contexts.pop(call_sid, None)
                         
             
         except Exception as e:
@@ -256,7 +361,6 @@ class VoiceTestRunner:
         finally:
             logger.debug("Disconnecting agent")
             self.agent.disconnect()
-            self.current_test = None
             logger.info(f"run_test_case finished for test: {test_case.name}")
 
     def _run_server_with_consumer(self, app, host: str = "0.0.0.0", port: int = 8765):
@@ -268,8 +372,11 @@ class VoiceTestRunner:
         logger.info("Scheduling _post_callback_consumer in _run_server_with_consumer.")
         self.server_loop.create_task(self._post_callback_consumer())
         
-        config = uvicorn.Config(app, host=host, port=port, log_level="info")
-        self.uvicorn_server_instance = uvicorn.Server(config)
+        # C parsers for HTTP and websocket frames, and no per-request access log line on the
+        # Twilio callback/media stream endpoints. The loop is already uvloop (see __init__).
+        config = uvicorn.Config(app, host=host, port=port, log_level="info",
+                                http="httptools", ws="websockets", access_log=False)
+        self.uvicorn_server_instance = _ReadySignalingServer(config, self._server_ready)
         try:
             logger.info(f"Starting uvicorn server on {host}:{port}")
             self.server_loop.run_until_complete(self.uvicorn_server_instance.serve())
@@ -277,21 +384,27 @@ class VoiceTestRunner:
             logger.error(f"Error running uvicorn server: {e}", exc_info=True)
             # Potentially re-raise or handle to signal failure to start
         finally:
+            # Unblock __init__ if the server exited without ever becoming ready
+            self._server_ready.set()
             logger.info(f"Uvicorn server on {host}:{port} has shut down.")
 
     async def run_all_tests(self, time_limit: int = 20):
         """Run all test cases"""
         logger.info(f"Starting execution of {len(self.test_cases)} test cases in run_all_tests")
         
+        # Calls share this runner's agent, port and Twilio number, so they must run one at a
+        # time; evaluating a finished call only needs its captured data, so it overlaps with
+        # the next call instead of delaying it
+        evaluations = []
         try:
             # Run tests
             for test_case in self.test_cases:
                 logger.info(f"Running test case: {test_case.name}")
-                result = await self.run_test_case(test_case, time_limit=time_limit)
-                self.results.append(result)
+                call_sid, evaluation_data = await self._run_call(test_case, time_limit)
+                evaluations.append(asyncio.create_task(self._evaluate_call(test_case, call_sid, evaluation_data)))
         finally:
-            # Consider moving cleanup here if runner is reused or if server should stop after all its tests
-            pass # self.cleanup() # Example: if cleanup should happen after all tests for this runner
+            # Keep results in test order, and still collect the calls that finished before a failure
+            self.results.extend(await asyncio.gather(*evaluations))
         
         logger.info("All test cases completed in run_all_tests")
 
@@ -325,92 +438,133 @@ class VoiceTestRunner:
         - Evaluations as an object array with metric name, result, and reason
         - Total pass vs fail in evaluator
         - Recording URL
+
+        A path ending in .parquet or .csv writes the same columns as a zstd-compressed
+        Parquet table or a CSV file instead (in CSV the evaluations cell holds their JSON
+        array); any other extension is replaced with .json.
         """
-        # Ensure the report path has a .json extension
-        if not report_path.endswith('.json'):
+        # Ensure the report path has a .json (or .parquet/.csv) extension
+        if not report_path.endswith(('.json', '.parquet', '.csv')):
             report_path = report_path.rsplit('.', 1)[0] + '.json'
             
         logger.debug(f"Saving comprehensive test report to: {report_path}")
         try:
-            # Create detailed report rows
-            rows = []
             logger.info(f"Saving report for {len(self.results)} test results")
-            
-            for result in self.results:
-                # Count pass/fail results
-                pass_count = 0
-                fail_count = 0
-                evaluations = []
-                
-                for eval_result in result.get("evaluator_results", []):
-                    # Create evaluation object with the required structure
-                    evaluation = {
-                        "metric_name": eval_result.name,
-                        "result": eval_result.result,  # This should be "pass" or "fail"
-                        "reason": eval_result.reason
-                    }
-                    evaluations.append(evaluation)
-                    
-                    if eval_result.result == "pass":
-                        pass_count += 1
-                    elif eval_result.result == "fail":
-                        fail_count += 1
-                
-                # Get test description from scenario
-                test_description = "No description available"
-                for test_case in self.test_cases:
-                    if test_case.name == result["test_case"]:
-                        test_description = test_case.scenario.prompt
-                        break
-                
-                # Create the row
-                row = {
-                    "test_name": result["test_case"],
-                    "test_description": test_description,
-                    "transcript": result["transcript"],
-                    "evaluations": evaluations,  # Now an array of objects
-                    "pass_count": pass_count,
-                    "fail_count": fail_count,
-                    "total_evaluations": pass_count + fail_count,
-                    "pass_rate": f"{(pass_count / (pass_count + fail_count) * 100) if (pass_count + fail_count) > 0 else 0:.2f}%",
-                    "recording_url": result.get("recording_url", "No recording URL available")
-                }
-                
-                rows.append(row)
-            
-            # Save as JSON
-            import json
-            with open(report_path, 'w') as f:
-                json.dump(rows, f, indent=2)
+            # One lookup table instead of scanning every test case per result (reversed so the
+            # first test case wins on duplicate names, as the scan did)
+            description_by_name = {test_case.name: test_case.scenario.prompt for test_case in reversed(self.test_cases)}
+
+            if report_path.endswith('.parquet'):
+                pq.write_table(self._report_table(description_by_name), report_path, compression="zstd")
+                logger.info(f"Saved comprehensive test report to {report_path}")
+                return
+            if report_path.endswith('.csv'):
+                pa_csv.write_csv(self._report_table(description_by_name, flat=True), report_path)
+                logger.info(f"Saved comprehensive test report to {report_path}")
+                return
+
+            # Rows are serialized and written one at a time rather than collected into a list first
+            with open(report_path, 'wb') as f:
+                f.write(b"[\n")
+                for index, result in enumerate(self.results):
+                    if index:
+                        f.write(b",\n")
+                    f.write(orjson.dumps(self._report_row(result, description_by_name), option=orjson.OPT_INDENT_2))
+                f.write(b"\n]\n")
             logger.info(f"Saved comprehensive test report to {report_path}")
             
         except Exception as e:
             logger.error(f"Error saving test report: {str(e)}", exc_info=True)
             raise
 
+    def _report_table(self, description_by_name: Dict[str, str], flat: bool = False) -> pa.Table:
+        """
+        Build the report as an Arrow table, filling one list per column as rows are built.
+
+        Args:
+            description_by_name (Dict[str, str]): Scenario prompt by test case name
+            flat (bool): Encode the evaluations array as a JSON string, for formats without nested values
+        """
+        columns = {name: [] for name in REPORT_COLUMNS}
+        for result in self.results:
+            for name, value in self._report_row(result, description_by_name).items():
+                columns[name].append(value)
+        if flat:
+            columns["evaluations"] = [orjson.dumps(evaluations).decode("utf-8") for evaluations in columns["evaluations"]]
+        return pa.table(columns)
+
+    def _report_row(self, result: dict, description_by_name: Dict[str, str]) -> dict:
+        """Build the report row for one test result"""
+        # Create evaluation objects with the required structure
+        evaluations = [
+            {
+                "metric_name": eval_result.name,
+                "result": eval_result.result,  # This should be "pass" or "fail"
+                "reason": eval_result.reason
+            }
+            for eval_result in result.get("evaluator_results", [])
+        ]
+        # Count pass/fail results
+        result_counts = Counter(evaluation["result"] for evaluation in evaluations)
+        pass_count = result_counts["pass"]
+        fail_count = result_counts["fail"]
+        
+        # Create the row
+        return {
+            "test_name": result["test_case"],
+            "test_description": description_by_name.get(result["test_case"], "No description available"),
+            "transcript": result["transcript"],
+            "evaluations": evaluations,  # Now an array of objects
+            "pass_count": pass_count,
+            "fail_count": fail_count,
+            "total_evaluations": pass_count + fail_count,
+            "pass_rate": f"{(pass_count / (pass_count + fail_count) * 100) if (pass_count + fail_count) > 0 else 0:.2f}%",
+            "recording_url": result.get("recording_url", "No recording URL available")
+        }
+
     async def _post_callback_consumer(self):
         """Continuously process callback data from the callback queue and set the results for associated call SID."""
         logger.info("_post_callback_consumer started.")
+        # Bound once for the lifetime of the loop rather than looked up per callback
+        queue_get = self.callback_queue.get
+        queue_get_nowait = self.callback_queue.get_nowait
+        complete_call = self._complete_call
         while True:
-            logger.debug("Waiting for callback data from the callback queue in _post_callback_consumer")
-            callback_data = await self.callback_queue.get()
-            logger.debug(f"Received enqueued data in _post_callback_consumer: {callback_data}")
-            call_sid = callback_data.get('CallSid')  # Twilio uses CallSid
-            if call_sid in self.call_completion_futures:
-                if not self.call_completion_futures[call_sid].done():
-                    # Get the transcript for this call from server
-                    transcript = self.agent.get_transcript()
-                    evaluation_data = {
-                        "transcript": transcript,
-                        "recording_url": self.agent.audio_file_name
-                    }
-                    self.call_completion_futures[call_sid].set_result(evaluation_data)
-                    await asyncio.sleep(0.1)  # Just a short sleep to let event loop process
-                    
-                else:
-                    logger.warning(f"Future already completed for call SID: {call_sid}")
-            else:
-                logger.warning(f"Received callback for unknown call SID: {call_sid}") 
+            # Drain whatever is already queued so a burst of status callbacks is handled in one pass
+            batch = [await queue_get()]
+            while len(batch) < CALLBACK_BATCH_SIZE:
+                try:
+                    batch.append(queue_get_nowait())
+                except asyncio.QueueEmpty:
+                    break
+            logger.debug("Received %d enqueued callbacks in _post_callback_consumer: %r", len(batch), batch)
+            # One completion per call SID, in arrival order
+            for call_sid in dict.fromkeys(callback_data.get('CallSid') for callback_data in batch):  # Twilio uses CallSid
+                complete_call(call_sid)
+            # get() doesn't suspend while items are queued, so yield to the server between batches
+            await asyncio.sleep(0)
+
+    def _complete_call(self, call_sid: Optional[str]):
+        """Resolve the completion future for a call with the transcript and recording captured for it"""
+        future = self.call_completion_futures.get(call_sid)
+        if future is None:
+            logger.warning(f"Received callback for unknown call SID: {call_sid}")
+            return
+        # The context is removed by the first callback, so a repeat callback finds it gone
+        call_context = self._call_contexts.pop(call_sid, None)
+        if call_context is None or future.done():
+            logger.warning(f"Future already completed for call SID: {call_sid}")
+            return
+        # Get the transcript and recording for this call from its own context
+        transcript = call_context.transcript_handler.get_messages()
+        logger.info(f"Transcript for call {call_sid}: {len(transcript)} characters")
+        evaluation_data = {"transcript": transcript}
+        # Without a recording the report falls back to "No recording URL available"
+        if call_context.audio_file_name:
+            evaluation_data["recording_url"] = call_context.audio_file_name
+        # The future belongs to the loop running run_test_case, not this server loop,
+        # so resolve it there to wake the waiting task immediately
+        future.get_loop().call_soon_threadsafe(_set_result_if_pending, future, evaluation_data)
 
     def cleanup(self):
         logger.info(f"VoiceTestRunner cleanup called for agent: {self.agent.agent_id}")
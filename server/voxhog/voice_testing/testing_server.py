@@ -2,10 +2,10 @@ from fastapi import FastAPI, HTTPException, Request, WebSocket
 from fastapi.middleware.cors import CORSMiddleware
 from starlette.responses import HTMLResponse
 from twilio.twiml.voice_response import VoiceResponse, Connect
-from fastapi.responses import PlainTextResponse
-import json
+from fastapi.responses import ORJSONResponse, PlainTextResponse
+import orjson
 import uvicorn
-from typing import Optional, Dict
+from typing import Optional
 import logging
 import os
 from pyngrok import ngrok, conf
@@ -13,7 +13,7 @@ from pyngrok import ngrok, conf
 from twilio.rest import Client
 from dotenv import load_dotenv
 import asyncio
-from collections import defaultdict
+from functools import lru_cache
 
 from ..voice_agent import Direction, VoiceAgent
 
@@ -21,6 +21,19 @@ from ..voice_agent import Direction, VoiceAgent
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+@lru_cache(maxsize=4)
+def _get_twilio_client(account_sid: Optional[str], auth_token: Optional[str]) -> Client:
+    """
+    Twilio REST client shared by every TestingServer with the same credentials, so its
+    pooled HTTP session (and kept-alive TLS connection) survives across test runners.
+    Keyed by credentials because the API server can replace them while running.
+    """
+    return Client(account_sid, auth_token)
+
+# Call statuses after which Twilio sends no further callbacks for a call. Twilio does not retry
+# a status callback that fails, so these must always reach the consumer
+_TERMINAL_CALL_STATUSES = frozenset({"completed", "busy", "failed", "no-answer", "canceled"})
+
 class TestingServer:
     """Server implementation for testing voice agents"""
     
@@ -35,27 +48,33 @@ class TestingServer:
         self.app: Optional[FastAPI] = None
         self.ngrok_tunnel = None
         self.base_url = None
+        self._webhook_base_url = None  # base_url last written to the Twilio number's voice webhook
         self.callback_queue = callback_queue
         self.call_sid_queue = call_sid_queue  # Queue for storing call SIDs from twilio_callback
+        # Loop awaiting call_sid_queue; set by the test runner, which runs on a different loop than this server
+        self.call_sid_loop: Optional[asyncio.AbstractEventLoop] = None
         
         # Load environment variables
         load_dotenv()
         
         # Initialize Twilio client
-        self.twilio_client = Client(
+        self.twilio_client = _get_twilio_client(
             os.getenv('TWILIO_ACCOUNT_SID'),
             os.getenv('TWILIO_AUTH_TOKEN')
         )
         
         self.twilio_phone_number = os.getenv('TWILIO_PHONE_NUMBER')
-                
-        self.transcripts: Dict[str, list] = defaultdict(list)
+        self.twilio_phone_number_sid = os.getenv('TWILIO_PHONE_NUMBER_SID')
 
     def update_twilio_phone_number_webhook_url(self):
         """Update the Twilio phone number"""
+        if self._webhook_base_url == self.base_url:
+            # Already pointing at this tunnel; skip the Twilio round trip
+            return
         try:
             logger.info(f"Updating Twilio phone number webhook URL to {self.base_url}/twilio_connect")
-            self.twilio_client.incoming_phone_numbers.get(sid = os.getenv('TWILIO_PHONE_NUMBER_SID')).update(voice_url=f"{self.base_url}/twilio_connect")
+            self.twilio_client.incoming_phone_numbers.get(sid = self.twilio_phone_number_sid).update(voice_url=f"{self.base_url}/twilio_connect")
+            self._webhook_base_url = self.base_url
         except Exception as e:
             logger.error(f"Error updating Twilio phone number webhook URL: {e}")
 
@@ -82,7 +101,9 @@ class TestingServer:
         """Initiate an outbound test call to the specified phone number for inbound agent testing"""
         try:
             logger.info(f"Creating call to {phone_number} from {self.twilio_phone_number} with time limit {time_limit}")
-            call = self.twilio_client.calls.create(
+            # The Twilio REST client is synchronous; run it in a thread so the loop keeps serving
+            call = await asyncio.to_thread(
+                self.twilio_client.calls.create,
                 to=phone_number,
                 from_=self.twilio_phone_number,
                 url=f"{self.base_url}/twilio_connect",
@@ -104,7 +125,7 @@ class TestingServer:
         Returns:
             FastAPI: Router with testing endpoints
         """
-        router = FastAPI()
+        router = FastAPI(default_response_class=ORJSONResponse)
         
         router.add_middleware(
             CORSMiddleware,
@@ -124,10 +145,12 @@ class TestingServer:
                 call_sid = data.get('CallSid')
 
                 if call_sid:
-                            
-                    await self.call_sid_queue.put(call_sid)
-                    await asyncio.sleep(0.1)
-                    logger.info(f"Received outbound call callback with CallSid: {call_sid}")
+                    # asyncio queues aren't thread-safe; hand the SID over on the loop that awaits it
+                    if self.call_sid_loop is not None and self.call_sid_loop is not asyncio.get_running_loop():
+                        self.call_sid_loop.call_soon_threadsafe(self.call_sid_queue.put_nowait, call_sid)
+                    else:
+                        self.call_sid_queue.put_nowait(call_sid)
+                    logger.info("Received outbound call callback with CallSid: %s", call_sid)
                     # Instruct Twilio to connect to our WebSocket
                     response = VoiceResponse()
                     connect = Connect()
@@ -148,9 +171,19 @@ class TestingServer:
             try:
                 form_data = await request.form()
                 data = dict(form_data)
-                logger.info(f"Received callback with data: {data}")
-                self.callback_queue.put_nowait(data)
-                logger.info(f"Enqueued data: {data}")
+                logger.info("Received callback with data: %s", data)
+                try:
+                    self.callback_queue.put_nowait(data)
+                except asyncio.QueueFull:
+                    status = data.get("CallStatus")
+                    if status is not None and status not in _TERMINAL_CALL_STATUSES:
+                        # Intermediate statuses don't complete a call, so shed them under load
+                        logger.warning("Callback queue full, dropping %s callback for CallSid: %s", status, data.get("CallSid"))
+                        return PlainTextResponse("busy", status_code=503)
+                    # A dropped completion would leave the test waiting out its timeout; wait for room instead
+                    logger.warning("Callback queue full, waiting to enqueue completion for CallSid: %s", data.get("CallSid"))
+                    await self.callback_queue.put(data)
+                logger.debug("Enqueued callback for CallSid: %s", data.get("CallSid"))
                 return {"status": "queued"}
             except Exception as e:
                 import traceback
@@ -163,19 +196,14 @@ class TestingServer:
             """Handle WebSocket connection for voice streaming"""
             await websocket.accept()
             
-            # Get initial connection data
-            start_data = websocket.iter_text()
-            await start_data.__anext__()
-            call_data = json.loads(await start_data.__anext__())
+            # Get initial connection data: Twilio sends a "connected" message, then "start"
+            await websocket.receive_text()
+            call_data = orjson.loads(await websocket.receive_text())
             stream_sid = call_data["start"]["streamSid"]
             call_sid = call_data["start"]["callSid"]
             
             logger.info(f"WebSocket connection accepted for call_sid {call_sid}")
             
-            # Store transcript for this call
-            transcript = []
-            
-            
             # Handle the connection with the voice agent
             await self.voice_agent.handle_websocket_connection(
                 websocket=websocket,
@@ -194,7 +222,7 @@ class TestingServer:
         Returns:
             FastAPI: Application instance with testing endpoints
         """
-        self.app = FastAPI(title="RagaAI Voice Agent Testing Server")
+        self.app = FastAPI(title="RagaAI Voice Agent Testing Server", default_response_class=ORJSONResponse)
         voice_router = self._create_router()
         logger.info(f"Mounting voice_router at /")
         self.app.mount("/", voice_router)